@@ -5,9 +5,12 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 
+import html
+from collections import Counter
 from datetime import datetime, timedelta
+from typing import Optional
 
-from monitor.db import query_events
+from monitor.db import query_events, query_spikes
 
 
 # ----------------------------
@@ -89,42 +92,124 @@ def apply_theme():
     )
 
 
+# ----------------------------
+# Data loading (cached across reruns)
+# ----------------------------
+# DuckDB only changes when ingest runs, so widget changes can reuse the last result.
+CACHE_TTL_S = 300
+FEED_LIMIT = 40  # rows rendered in the Feed panel
+
+
+def _cache_ts(dt: datetime) -> str:
+    # floor to 5 minutes so consecutive reruns share a cache key
+    dt = dt.replace(minute=dt.minute - dt.minute % 5, second=0, microsecond=0)
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+@st.cache_data(ttl=CACHE_TTL_S, show_spinner=False)
+def load_events(domain: str, since_ts: str, min_priority: int) -> pd.DataFrame:
+    df = query_events(domain=domain, since_ts=since_ts, min_priority=min_priority)
+    # low-cardinality keys: groupbys work on integer codes instead of hashing strings
+    for c in ("domain", "source_name"):
+        df[c] = df[c].astype("category")
+    return df
+
+
+@st.cache_data(ttl=CACHE_TTL_S, show_spinner=False)
+def load_spikes(
+    domain: str,
+    min_priority: int,
+    lookback_days: int,
+    baseline_days: int,
+    top_n: int,
+    now_ts: str,
+) -> pd.DataFrame:
+    # now_ts is the same 5-minute-floored clock load_events' since_ts comes from,
+    # so both caches turn over together and the panel doesn't run ahead of the others
+    return query_spikes(
+        group_col="situation",
+        lookback_days=lookback_days,
+        baseline_days=baseline_days,
+        min_total=3,
+        top_n=top_n,
+        domain=domain,
+        min_priority=min_priority,
+        now=datetime.strptime(now_ts, "%Y-%m-%d %H:%M:%S"),
+    )
+
+
+def _frame_key(d: pd.DataFrame):
+    # cheap identity for event frames: avoids hashing every cell on each rerun
+    if d.empty or "event_id" not in d.columns:
+        return (len(d), "", "")
+    return (len(d), d["event_id"].iloc[0], d["event_id"].iloc[-1])
+
+
 # ----------------------------
 # Helpers
 # ----------------------------
+@st.cache_data(ttl=CACHE_TTL_S, show_spinner=False, hash_funcs={pd.DataFrame: _frame_key})
 def exploded_view(df: pd.DataFrame) -> pd.DataFrame:
-    d = df.copy()
-    d["tags"] = d.get("tags", "").fillna("").astype(str)
-    d["tag_list"] = d["tags"].apply(lambda x: [t.strip() for t in x.split(",") if t.strip()])
-    d = d.explode("tag_list")
-    d["situation"] = d.apply(
-        lambda r: r["tag_list"] if isinstance(r["tag_list"], str) and r["tag_list"] else f"untagged:{r['domain']}",
-        axis=1,
-    )
-    d["ts"] = pd.to_datetime(d["ts"], errors="coerce")
-    d = d.dropna(subset=["ts"])
-    d["date"] = d["ts"].dt.date
+    tags = df.get("tags", "").fillna("").astype(str)
+    d = df.assign(tags=tags, tag_list=tags.str.split(",")).explode("tag_list")
+    d["tag_list"] = d["tag_list"].str.strip()
+
+    # drop empty fragments ("a,,b") but keep one row for events with no tags at all
+    mask = d["tag_list"] != ""
+    keep = mask | (~mask.groupby(level=0).transform("any") & ~d.index.duplicated())
+    d, mask = d[keep], mask[keep]
+
+    d["tag_list"] = d["tag_list"].where(mask)
+    d["situation"] = pd.Categorical(np.where(mask, d["tag_list"], "untagged:" + d["domain"].astype(str)))
+    # DuckDB already hands back TIMESTAMP columns; only parse when given strings
+    if not pd.api.types.is_datetime64_any_dtype(d["ts"]):
+        d["ts"] = pd.to_datetime(d["ts"], errors="coerce", cache=True)
+        d = d.dropna(subset=["ts"])
+    # day buckets as datetime64 (.dt.date builds Python date objects)
+    d["date"] = d["ts"].values.astype("datetime64[D]")
     return d
 
 
-def build_active_situations_exploded(df: pd.DataFrame, top_n: int = 12) -> pd.DataFrame:
-    d = exploded_view(df)
+def build_active_situations_exploded(d: pd.DataFrame, top_n: int = 12) -> pd.DataFrame:
+    # d: exploded_view() output
     agg = (
-        d.groupby("situation")
+        d.groupby("situation", observed=True)
         .agg(
             events=("event_id", "count"),
             max_priority=("priority", "max"),
             avg_priority=("priority", "mean"),
             last_ts=("ts", "max"),
-            top_source=("source_name", lambda x: x.value_counts().index[0] if len(x) else ""),
         )
         .reset_index()
     )
+    # most frequent source per situation; sort=False + stable sort keep value_counts'
+    # tie-break (first source seen wins)
+    top_source = (
+        d.groupby(["situation", "source_name"], observed=True, sort=False)
+        .size()
+        .reset_index(name="n")
+        .sort_values("n", ascending=False, kind="stable")
+        .drop_duplicates("situation")[["situation", "source_name"]]
+        .rename(columns={"source_name": "top_source"})
+    )
+    agg = agg.merge(top_source, on="situation", how="left")
+    agg["top_source"] = agg["top_source"].astype(object).fillna("")
     agg["situation_score"] = (agg["max_priority"] * 1.0) + (agg["events"] * 2.0) + (agg["avg_priority"] * 0.2)
     agg = agg.sort_values(["situation_score", "max_priority", "events"], ascending=False).head(top_n)
     return agg
 
 
+def _n_since(d: pd.DataFrame, cutoff: pd.Timestamp) -> int:
+    # d is ordered by ts DESC (query_events order), so rows with ts >= cutoff are a
+    # prefix; binary search on the reversed (ascending) view gives its length
+    ts = d["ts"].to_numpy()
+    return len(ts) - int(np.searchsorted(ts[::-1], np.datetime64(cutoff), side="left"))
+
+
+def since(d: pd.DataFrame, cutoff: pd.Timestamp) -> pd.DataFrame:
+    return d.iloc[: _n_since(d, cutoff)]
+
+
 def detect_spikes(
     d_exploded: pd.DataFrame,
     group_col: str = "situation",
@@ -132,34 +217,55 @@ def detect_spikes(
     baseline_days: int = 7,
     min_events_total: int = 3,
     top_n: int = 12,
+    now: Optional[pd.Timestamp] = None,
 ) -> pd.DataFrame:
+    # In-memory variant of monitor.db.query_spikes; still used for the domain panel.
     if d_exploded.empty:
         return pd.DataFrame()
+    if not d_exploded["ts"].is_monotonic_decreasing:
+        d_exploded = d_exploded.sort_values("ts", ascending=False, kind="stable")
 
-    now = pd.Timestamp.now()
+    now = pd.Timestamp.now() if now is None else now
     cutoff_recent = now - pd.Timedelta(hours=24)
     cutoff_lookback = now - pd.Timedelta(days=lookback_days)
     cutoff_baseline_start = now - pd.Timedelta(days=baseline_days + 1)
-    cutoff_baseline_end = cutoff_recent
 
-    x = d_exploded[d_exploded["ts"] >= cutoff_lookback].copy()
-    daily = x.groupby([group_col, "date"]).size().reset_index(name="count")
+    # single pass over the exploded rows: flag each window, then one (group, date)
+    # groupby gives every per-day count; the rest works on that small frame
+    # (ts-sorted, so each window is a positional range found by binary search)
+    x = since(d_exploded, min(cutoff_lookback, cutoff_baseline_start))
+    pos = np.arange(len(x))
+    n_recent = _n_since(x, cutoff_recent)
+    per_day = (
+        pd.DataFrame(
+            {
+                group_col: x[group_col],
+                "date": x["date"],
+                "lookback": pos < _n_since(x, cutoff_lookback),
+                "recent": pos < n_recent,
+                "baseline": (pos >= n_recent) & (pos < _n_since(x, cutoff_baseline_start)),
+            }
+        )
+        .groupby([group_col, "date"], observed=True)[["lookback", "recent", "baseline"]]
+        .sum()
+        .reset_index()
+    )
+
+    daily = per_day.loc[per_day["lookback"] > 0, [group_col, "date", "lookback"]].rename(columns={"lookback": "count"})
     if daily.empty:
         return pd.DataFrame()
 
-    recent = (
-        d_exploded[d_exploded["ts"] >= cutoff_recent]
-        .groupby(group_col)
-        .size()
-        .rename("recent_24h")
+    recent = per_day.groupby(group_col, observed=True)["recent"].sum().rename("recent_24h").reset_index()
+
+    baseline = (
+        per_day[per_day["baseline"] > 0]
+        .groupby(group_col, observed=True)["baseline"]
+        .mean()
+        .rename("baseline_avg")
         .reset_index()
     )
 
-    baseline_slice = d_exploded[(d_exploded["ts"] >= cutoff_baseline_start) & (d_exploded["ts"] < cutoff_baseline_end)]
-    baseline_daily = baseline_slice.groupby([group_col, "date"]).size().reset_index(name="count")
-    baseline = baseline_daily.groupby(group_col)["count"].mean().rename("baseline_avg").reset_index()
-
-    stats = daily.groupby(group_col)["count"].agg(mu="mean", sigma="std", total="sum", days="count").reset_index()
+    stats = daily.groupby(group_col, observed=True)["count"].agg(mu="mean", sigma="std", total="sum", days="count").reset_index()
 
     out = stats.merge(recent, on=group_col, how="left").merge(baseline, on=group_col, how="left")
     out["recent_24h"] = out["recent_24h"].fillna(0).astype(int)
@@ -204,58 +310,46 @@ TIME_WINDOWS = {
 }
 
 def top_tags_counts(df: pd.DataFrame, top_n: int = 60) -> pd.DataFrame:
-    tags = df.get("tags", "").fillna("").astype(str).str.split(",")
-    tag_series = tags.explode()
-    tag_series = tag_series[tag_series != ""]
-    vc = tag_series.value_counts().head(top_n)
-    return vc.rename_axis("tag").reset_index(name="count")
-
-
-def render_text_cloud(tag_df: pd.DataFrame):
-    if tag_df.empty:
-        st.caption("No tags in this window.")
-        return
-
-    dfw = tag_df.head(45).copy()
-    cmin, cmax = dfw["count"].min(), dfw["count"].max()
+    tags = df.get("tags", "").fillna("").astype(str)
+    # flat count over the split strings; no exploded intermediate Series
+    counts = Counter(t for s in tags for t in s.split(",") if t)
+    return pd.DataFrame(counts.most_common(top_n), columns=["tag", "count"])
 
-    def scale(c):
-        if cmax == cmin:
-            return 22
-        return 14 + (c - cmin) * (46 - 14) / (cmax - cmin)
 
-    dfw["size"] = dfw["count"].apply(scale)
+@st.cache_data(ttl=CACHE_TTL_S, show_spinner=False)
+def text_cloud_svg(tags: tuple, counts: tuple) -> str:
+    # static SVG: a decorative panel doesn't need a Plotly figure per rerun
+    c = np.asarray(counts, dtype=float)
+    cmin, cmax = c.min(), c.max()
+    sizes = np.full(len(c), 22.0) if cmax == cmin else 14 + (c - cmin) * (46 - 14) / (cmax - cmin)
 
-    # spiral-ish deterministic layout
-    n = len(dfw)
+    # spiral-ish deterministic layout on a 700x280 canvas
+    n = len(c)
     angles = np.linspace(0, 6 * np.pi, n)
     radii = np.linspace(0.15, 1.0, n)
-    dfw["x"] = np.cos(angles) * radii
-    dfw["y"] = np.sin(angles) * radii
-
-    fig = go.Figure()
-    fig.add_trace(
-        go.Scatter(
-            x=dfw["x"],
-            y=dfw["y"],
-            mode="text",
-            text=dfw["tag"],
-            textfont=dict(size=dfw["size"]),
-            hovertext=[f"{t}: {c}" for t, c in zip(dfw["tag"], dfw["count"])],
-            hoverinfo="text",
-        )
-    )
+    xs = 350 + np.cos(angles) * radii * 320
+    ys = 140 - np.sin(angles) * radii * 115
 
-    fig.update_layout(
-        template="plotly_dark",
-        height=280,
-        margin=dict(l=0, r=0, t=10, b=0),
-        xaxis=dict(visible=False),
-        yaxis=dict(visible=False),
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
+    words = "".join(
+        f'<text x="{x:.1f}" y="{y:.1f}" font-size="{s:.1f}px">'
+        f"<title>{html.escape(t)}: {k}</title>{html.escape(t)}</text>"
+        for t, k, x, y, s in zip(tags, counts, xs, ys, sizes)
+    )
+    return (
+        '<svg viewBox="0 0 700 280" width="100%" height="280" '
+        'text-anchor="middle" dominant-baseline="middle" fill="#f2f5fa" '
+        'font-family="sans-serif">' + words + "</svg>"
     )
-    st.plotly_chart(fig, use_container_width=True)
+
+
+def render_text_cloud(tag_df: pd.DataFrame):
+    if tag_df.empty:
+        st.caption("No tags in this window.")
+        return
+
+    dfw = tag_df.head(45)
+    svg = text_cloud_svg(tuple(dfw["tag"]), tuple(int(k) for k in dfw["count"]))
+    st.markdown(svg, unsafe_allow_html=True)
 
 
 # ----------------------------
@@ -267,6 +361,39 @@ DOMAIN_COLOR = {
     "all": "#38bdf8",          # cyan
 }
 
+# past this many markers Plotly's JSON + browser render dominates; thin to a grid
+MAP_MAX_POINTS = 2000
+MAP_GRID_DEG = 0.25
+
+# hover fields, indexed as customdata[i] in the hovertemplate
+MAP_CUSTOMDATA_COLS = [
+    "source_name",
+    "domain",
+    "priority",
+    "severity",
+    "geo_label",
+    "geo_country",
+    "source_url",
+    "tags",
+    "summary",
+]
+
+
+def decimate_map_points(df_map: pd.DataFrame) -> pd.DataFrame:
+    # keep the highest-priority event per (domain, grid cell)
+    d = df_map.reset_index(drop=True)
+    cells = pd.DataFrame(
+        {
+            "domain": d["domain"],
+            "lat_bin": np.round(d["geo_lat"].to_numpy() / MAP_GRID_DEG) * MAP_GRID_DEG,
+            "lon_bin": np.round(d["geo_lon"].to_numpy() / MAP_GRID_DEG) * MAP_GRID_DEG,
+            "priority": pd.to_numeric(d["priority"], errors="coerce").fillna(-1),
+        }
+    )
+    keep = cells.groupby(["domain", "lat_bin", "lon_bin"], observed=True)["priority"].idxmax()
+    return d.loc[np.sort(keep.to_numpy())]
+
+
 def openstreet_dark_map(df_map: pd.DataFrame):
     if df_map.empty:
         st.caption("No geo-coded events in this window yet (ingest will populate geo_lat/geo_lon).")
@@ -282,6 +409,8 @@ def openstreet_dark_map(df_map: pd.DataFrame):
     if df_map.empty:
         st.caption("No valid geo coordinates to display.")
         return
+    if len(df_map) > MAP_MAX_POINTS:
+        df_map = decimate_map_points(df_map)
     for dom in sorted(df_map["domain"].unique()):
         sub = df_map[df_map["domain"] == dom].copy()
         if sub.empty:
@@ -300,19 +429,13 @@ def openstreet_dark_map(df_map: pd.DataFrame):
                 textposition="middle center",
                 textfont=dict(size=30, color=color),
                 hovertext=sub["title"],
-                customdata=np.stack(
-                    [
-                        sub["source_name"].astype(str),
-                        sub["domain"].astype(str),
-                        sub["priority"].fillna(0).astype(int).astype(str),
-                        sub["severity"].fillna(0).astype(int).astype(str),
-                        sub["geo_label"].fillna("").astype(str),
-                        sub["geo_country"].fillna("").astype(str),
-                        sub["source_url"].fillna("").astype(str),
-                        sub["tags"].fillna("").astype(str),
-                        sub["summary"].fillna("").astype(str),
-                    ],
-                    axis=1,
+                customdata=(
+                    sub[MAP_CUSTOMDATA_COLS]
+                    .astype({"priority": "Int64", "severity": "Int64"})
+                    .astype(object)
+                    .fillna("")
+                    .astype(str)
+                    .to_numpy()
                 ),
                 hovertemplate=(
                     "<b>%{hovertext}</b><br>"
@@ -355,28 +478,67 @@ def openstreet_dark_map(df_map: pd.DataFrame):
 
 
 # ----------------------------
-# Table styling helper
+# Feed: one markdown block per panel instead of one element per row
 # ----------------------------
-def apply_heat_styles(df: pd.DataFrame):
-    d = df.copy()
-    for col in ["priority", "severity"]:
-        if col in d.columns:
-            d[col] = pd.to_numeric(d[col], errors="coerce").fillna(0)
-
-    sty = d.style
-    if "priority" in d.columns:
-        sty = sty.background_gradient(subset=["priority"], cmap="Blues")
-    if "severity" in d.columns:
-        sty = sty.background_gradient(subset=["severity"], cmap="Reds")
-
-    sty = sty.set_table_styles(
-        [
-            {"selector": "th", "props": "background-color:#0f1620;color:#e8edf2;border:1px solid rgba(255,255,255,.10);"},
-            {"selector": "td", "props": "background-color:#0b0f14;color:#e8edf2;border:1px solid rgba(255,255,255,.07);"},
-            {"selector": "table", "props": "border-collapse:collapse;border:1px solid rgba(255,255,255,.10);"},
-        ]
+def _txt(col: pd.Series) -> pd.Series:
+    return col.astype(object).fillna("").astype(str)
+
+
+def feed_markdown(show: pd.DataFrame) -> str:
+    summary = _txt(show["summary"]).str.slice(0, 350)
+    text = (
+        "**[" + _txt(show["title"]) + "](" + _txt(show["source_url"]) + ")**  \n"
+        + _txt(show["source_name"]) + " — " + _txt(show["domain"]) + " — " + _txt(show["ts"]) + "  \n"
+        + "Priority: **" + _txt(show["priority"]) + "** | Severity: " + _txt(show["severity"])
+        + " | Tags: `" + _txt(show["tags"]) + "`"
+        + np.where(summary != "", "\n\n" + summary, "")
+        + "\n\n---\n\n"
+    )
+    return text.str.cat()
+
+
+def items_markdown(items: pd.DataFrame) -> str:
+    lines = (
+        "- **[" + _txt(items["title"]) + "](" + _txt(items["source_url"]) + ")** — "
+        + _txt(items["source_name"]) + " — " + _txt(items["ts"]) + " — Priority **" + _txt(items["priority"]) + "**"
     )
-    return sty
+    return lines.str.cat(sep="\n")
+
+
+# ----------------------------
+# Events table: rendered client-side from Arrow, paged
+# ----------------------------
+EVENTS_PAGE_ROWS = 500
+
+
+def _more_events():
+    st.session_state["events_rows"] += EVENTS_PAGE_ROWS
+
+
+def render_events_table(table_df: pd.DataFrame):
+    st.session_state.setdefault("events_rows", EVENTS_PAGE_ROWS)
+    n = st.session_state["events_rows"]
+
+    st.dataframe(
+        table_df.head(n),
+        column_config={
+            "priority": st.column_config.ProgressColumn("priority", min_value=0, max_value=100, format="%d"),
+            "severity": st.column_config.ProgressColumn("severity", min_value=0, max_value=100, format="%d"),
+            "source_url": st.column_config.LinkColumn("source_url"),
+        },
+        hide_index=True,
+        use_container_width=True,
+    )
+
+    if len(table_df) > n:
+        st.caption(f"Showing {n} of {len(table_df)} events.")
+        st.button("Load more", on_click=_more_events)
+
+
+@st.cache_data(ttl=CACHE_TTL_S, show_spinner=False)
+def _table_csv(df: pd.DataFrame) -> bytes:
+    # serialized only when the table content changes, not on every rerun
+    return df.to_csv(index=False, lineterminator="\n", date_format="%Y-%m-%dT%H:%M:%S").encode("utf-8")
 
 
 # ----------------------------
@@ -407,21 +569,28 @@ with st.sidebar:
 
 
 max_td = max(TIME_WINDOWS.values())
-since_query = (datetime.now() - max_td).strftime("%Y-%m-%d %H:%M:%S")
-df = query_events(domain=domain, since_ts=since_query, min_priority=min_priority)
+load_clock = datetime.now()
+since_query = _cache_ts(load_clock - max_td)
+df = load_events(domain=domain, since_ts=since_query, min_priority=min_priority)
 
 if df.empty:
     st.warning("No events yet for these filters. Run `python ingest.py`.")
     st.stop()
 
-df["ts"] = pd.to_datetime(df["ts"], errors="coerce")
+if not pd.api.types.is_datetime64_any_dtype(df["ts"]):
+    df["ts"] = pd.to_datetime(df["ts"], errors="coerce")
 df = df.dropna(subset=["ts"])
+# panels slice time windows positionally (see since()); DuckDB already returns ts DESC
+if not df["ts"].is_monotonic_decreasing:
+    df = df.sort_values("ts", ascending=False, kind="stable")
 
 df_ex = exploded_view(df)
 
+# one clock reading per rerender, shared by every windowed panel
+now = pd.Timestamp.now()
 window_td = TIME_WINDOWS[top_window]
-cutoff = pd.Timestamp.now() - window_td
-df_top = df[df["ts"] >= cutoff].copy()
+cutoff = now - window_td
+df_top = since(df, cutoff).copy()
 
 # ----------------------------
 # Overview
@@ -439,7 +608,7 @@ with m1:
     else:
         dtime = df_top.copy()
         if window_td <= timedelta(days=3):
-            dtime["ts_hour"] = dtime["ts"].dt.floor("H")
+            dtime["ts_hour"] = dtime["ts"].dt.floor("h")
             series = dtime.groupby("ts_hour").size().reset_index(name="count")
             fig_t = px.line(series, x="ts_hour", y="count")
         else:
@@ -479,26 +648,20 @@ left, right = st.columns([2, 1])
 
 with left:
     st.subheader("Feed")
-    show = df_top.sort_values(["ts", "priority"], ascending=[False, False]).head(40)
-    for _, r in show.iterrows():
-        st.markdown(
-            f"**[{r['title']}]({r['source_url']})**  \n"
-            f"{r['source_name']} — {r['domain']} — {r['ts']}  \n"
-            f"Priority: **{r['priority']}** | Severity: {r['severity']} | Tags: `{r['tags']}`"
-        )
-        if r.get("summary"):
-            st.caption(str(r["summary"])[:350])
-        st.divider()
+    # df_top is already ts DESC, priority DESC (DuckDB order): the feed is its head
+    show = df_top.head(FEED_LIMIT)
+    if not show.empty:
+        st.markdown(feed_markdown(show))
 
 with right:
     st.subheader("Spikes (24h vs baseline)")
-    spikes_tags = detect_spikes(
-        df_ex,
-        group_col="situation",
+    spikes_tags = load_spikes(
+        domain=domain,
+        min_priority=min_priority,
         lookback_days=int(lookback_days),
         baseline_days=int(baseline_days),
-        min_events_total=3,
         top_n=10,
+        now_ts=_cache_ts(load_clock),
     )
     if spikes_tags.empty:
         st.caption("No spikes detected yet (need more history / events).")
@@ -515,6 +678,7 @@ with right:
         baseline_days=int(baseline_days),
         min_events_total=3,
         top_n=5,
+        now=now,
     )
     if spikes_domain.empty:
         st.caption("No domain-level spikes yet.")
@@ -524,8 +688,9 @@ with right:
     st.divider()
 
     st.subheader("Active Situations")
-    sit = build_active_situations_exploded(df_top if not df_top.empty else df, top_n=12)
-    sub_ex = exploded_view(df_top if not df_top.empty else df)
+    # df_ex keeps df's ts DESC order, so the window's exploded rows are a prefix of it
+    sub_ex = since(df_ex, cutoff) if not df_top.empty else df_ex
+    sit = build_active_situations_exploded(sub_ex, top_n=12)
 
     for _, s in sit.iterrows():
         label = s["situation"]
@@ -541,10 +706,8 @@ with right:
                 .drop_duplicates(subset=["event_id"])
                 .head(10)
             )
-            for _, rr in items.iterrows():
-                st.markdown(
-                    f"- **[{rr['title']}]({rr['source_url']})** — {rr['source_name']} — {rr['ts']} — Priority **{rr['priority']}**"
-                )
+            if not items.empty:
+                st.markdown(items_markdown(items))
         st.divider()
 
     st.subheader("Rankings")
@@ -554,7 +717,7 @@ with right:
 
     st.write("**Top Sources**")
     st.dataframe(
-        (df_top if not df_top.empty else df)["source_name"].value_counts().head(15).rename("count"),
+        (df_top if not df_top.empty else df)["source_name"].value_counts().loc[lambda vc: vc > 0].head(15).rename("count"),
         use_container_width=True,
     )
 
@@ -566,10 +729,9 @@ st.subheader("Events Table")
 table_df = df_top[["ts", "domain", "priority", "severity", "source_name", "title", "source_url", "tags"]].copy()
 table_df = table_df.sort_values(["ts", "priority"], ascending=[False, False])
 
-# Use st.write(Styler) to ensure styles render
-st.write(apply_heat_styles(table_df))
+render_events_table(table_df)
 
-csv_bytes = table_df.to_csv(index=False).encode("utf-8")
+csv_bytes = _table_csv(table_df)
 st.download_button(
     "Download events CSV",
     data=csv_bytes,
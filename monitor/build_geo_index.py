@@ -1,8 +1,11 @@
+# run from the repo root: python -m monitor.build_geo_index
 import pandas as pd
 from pathlib import Path
 
+from monitor.geo_lookup import _norm_series
+
 src = Path("data/cities15000.txt")
-out = Path("data/geo_index.csv")
+out = Path("data/geo_index.parquet")
 
 cols = [
     "geonameid","name","asciiname","alternatenames","lat","lon",
@@ -28,6 +31,10 @@ geo = pd.concat([base, alt[["alias","lat","lon","country_code","population"]]])
 geo = geo.drop_duplicates(subset=["alias"])
 geo = geo.sort_values("population", ascending=False)
 
-geo.to_csv(out, index=False)
+# normalize once here so lookups don't redo it on every process start
+geo["alias_norm"] = _norm_series(geo["alias"])
+geo = geo[geo["alias_norm"] != ""]
+
+geo.to_parquet(out, index=False, compression="zstd")
 
 print(f"Geo index saved → {out} ({len(geo)} rows)")
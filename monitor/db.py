@@ -1,12 +1,16 @@
 # monitor/db.py
 from __future__ import annotations
 
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, List
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Tuple, Iterator, Union
+import threading
 import duckdb
 import pandas as pd
+import pyarrow as pa
 
-DB_PATH = (Path(__file__).resolve().parent.parent / "events.duckdb")
+DB_PATH = (Path(__file__).resolve().parent.parent / "events.duckdb")
 
 # Canonical schema order (we'll insert by name, but keep this list as truth)
 EVENT_COLUMNS: List[str] = [
@@ -34,7 +38,12 @@ EVENT_COLUMNS: List[str] = [
 ]
 
 
-def connect() -> duckdb.DuckDBPyConnection:
+def connect(read_only: bool = False) -> duckdb.DuckDBPyConnection:
+    if read_only:
+        # Readers take a shared lock, so concurrent dashboard sessions can query at once.
+        # The schema is owned by the write path; nothing to create here.
+        return duckdb.connect(str(DB_PATH), read_only=True)
+
     con = duckdb.connect(str(DB_PATH))
 
     # Create full table (includes geo_* fields)
@@ -66,40 +75,135 @@ def connect() -> duckdb.DuckDBPyConnection:
         """
     )
 
+    # Dashboard filters: priority/ts range scans ordered by ts, plus domain equality
+    con.execute("CREATE INDEX IF NOT EXISTS idx_events_ts_prio ON events(ts, priority)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_events_domain ON events(domain)")
+
+    # Conditional GET validators per feed URL, kept with the events they cover:
+    # a fresh database starts without them and fetches every feed in full
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS feeds (
+          url VARCHAR PRIMARY KEY,
+          etag VARCHAR,
+          modified VARCHAR
+        );
+        """
+    )
+
     return con
 
 
-def upsert_events(df: pd.DataFrame) -> None:
+# One read/write connection per process: the schema DDL runs once and writes skip
+# the open/close round trip. DuckDB connections aren't thread-safe -> use _CON_LOCK.
+_CON: Optional[duckdb.DuckDBPyConnection] = None
+_CON_LOCK = threading.Lock()
+
+
+def _con() -> duckdb.DuckDBPyConnection:
+    global _CON
+    if _CON is None:
+        _CON = connect()
+    return _CON
+
+
+def close() -> None:
+    """Close the process-wide connection (releases DuckDB's file lock)."""
+    global _CON
+    with _CON_LOCK:
+        if _CON is not None:
+            _CON.close()
+            _CON = None
+
+
+@contextmanager
+def _reader() -> Iterator[duckdb.DuckDBPyConnection]:
+    # Reuse the writer if this process already opened it (DuckDB rejects a second
+    # connection to the same file with another config). Otherwise read through a
+    # short-lived read-only connection: keeping one open in the dashboard would hold
+    # the file lock and block ingest from writing.
+    with _CON_LOCK:
+        if _CON is not None:
+            yield _CON
+            return
+
+    con = connect(read_only=True)
+    try:
+        yield con
+    finally:
+        con.close()
+
+
+def upsert_events(df: Union[pd.DataFrame, pa.Table]) -> None:
     """
     Safe upsert:
+    - Accepts a pandas DataFrame or a pyarrow Table (scanned by DuckDB directly)
     - Ensures the dataframe has the required columns (missing -> NULL)
     - Inserts by column names (NOT by position)
+    - Existing event_ids are updated in place (ON CONFLICT), in a single statement
     """
-    if df is None or df.empty:
+    if df is None:
         return
 
-    con = connect()
+    if isinstance(df, pa.Table):
+        if df.num_rows == 0:
+            return
+        for c in EVENT_COLUMNS:
+            if c not in df.column_names:
+                df = df.append_column(c, pa.nulls(df.num_rows))
+        df = df.select(EVENT_COLUMNS)
+    else:
+        if df.empty:
+            return
+
+        # Ensure all columns exist in df (missing -> None)
+        for c in EVENT_COLUMNS:
+            if c not in df.columns:
+                df[c] = None
 
-    # Ensure all columns exist in df (missing -> None)
-    for c in EVENT_COLUMNS:
-        if c not in df.columns:
-            df[c] = None
+        # Keep only known columns, in canonical order
+        df = df[EVENT_COLUMNS].copy()
 
-    # Keep only known columns, in canonical order
-    df = df[EVENT_COLUMNS].copy()
+    with _CON_LOCK:
+        con = _con()
+        con.register("incoming", df)
 
-    # Upsert manual: delete then insert
-    ids = df["event_id"].astype(str).tolist()
-    if ids:
-        con.execute("DELETE FROM events WHERE event_id IN (SELECT * FROM UNNEST(?))", [ids])
+        cols_sql = ", ".join(EVENT_COLUMNS)
+        set_sql = ", ".join(f"{c} = EXCLUDED.{c}" for c in EVENT_COLUMNS if c != "event_id")
+        con.execute(
+            f"INSERT INTO events ({cols_sql}) SELECT {cols_sql} FROM incoming "
+            f"ON CONFLICT (event_id) DO UPDATE SET {set_sql}"
+        )
 
-    con.register("incoming", df)
+        con.unregister("incoming")
 
-    cols_sql = ", ".join(EVENT_COLUMNS)
-    con.execute(f"INSERT INTO events ({cols_sql}) SELECT {cols_sql} FROM incoming")
 
-    con.unregister("incoming")
-    con.close()
+def load_feed_validators() -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """
+    url -> (etag, modified) for conditional GETs.
+    Empty while the events table is empty, so a rebuilt database refetches everything.
+    Reads through a short-lived connection: ingest only takes the write lock to store.
+    """
+    if not DB_PATH.exists():
+        return {}
+    with _reader() as con:
+        if not con.execute("SELECT count(*) FROM duckdb_tables() WHERE table_name = 'feeds'").fetchone()[0]:
+            return {}  # database from before the feeds table
+        rows = con.execute(
+            "SELECT url, etag, modified FROM feeds WHERE EXISTS (SELECT 1 FROM events)"
+        ).fetchall()
+    return {url: (etag, modified) for url, etag, modified in rows}
+
+
+def save_feed_validators(validators: Dict[str, Tuple[Optional[str], Optional[str]]]) -> None:
+    if not validators:
+        return
+    with _CON_LOCK:
+        _con().executemany(
+            "INSERT INTO feeds (url, etag, modified) VALUES (?, ?, ?) "
+            "ON CONFLICT (url) DO UPDATE SET etag = EXCLUDED.etag, modified = EXCLUDED.modified",
+            [[url, etag, modified] for url, (etag, modified) in validators.items()],
+        )
 
 
 def query_events(
@@ -107,9 +211,25 @@ def query_events(
     since_ts: Optional[str] = None,
     min_priority: int = 0
 ) -> pd.DataFrame:
-    con = connect()
+    if not DB_PATH.exists():
+        # read-only connections can't create the file; nothing ingested yet
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+
+    where_sql, params = _event_filters(domain, since_ts, min_priority)
+    q = f"""
+    SELECT * FROM events
+    WHERE {where_sql}
+    ORDER BY ts DESC, priority DESC
+    """
+
+    with _reader() as con:
+        df = con.execute(q, params).df()
+    return df
+
+
+def _event_filters(domain: Optional[str], since_ts, min_priority: int) -> Tuple[str, list]:
     wh = ["priority >= ?"]
-    params = [min_priority]
+    params: list = [min_priority]
 
     if domain and domain != "all":
         wh.append("domain = ?")
@@ -119,12 +239,111 @@ def query_events(
         wh.append("ts >= ?")
         params.append(since_ts)
 
-    where_sql = " AND ".join(wh)
+    return " AND ".join(wh), params
+
+
+# Spike grouping keys that query_spikes knows how to compute server-side
+_SPIKE_GROUPS = {"situation", "domain"}
+
+
+def query_spikes(
+    group_col: str = "situation",
+    lookback_days: int = 14,
+    baseline_days: int = 7,
+    min_total: int = 3,
+    top_n: int = 12,
+    domain: Optional[str] = None,
+    min_priority: int = 0,
+    now: Optional[datetime] = None,
+) -> pd.DataFrame:
+    """
+    Spike detection (24h vs baseline) computed inside DuckDB:
+    - Tags are exploded server-side (untagged events -> "untagged:<domain>")
+    - Daily counts, mu/sigma, recent_24h and baseline_avg come from one CTE
+    - Only the sorted top_n rows are returned
+    - Windows are relative to now (pass the caller's clock to line up with other panels)
+    """
+    out_cols = ["group", "recent_24h", "baseline_avg", "pct_vs_baseline", "z_today", "total"]
+    if group_col not in _SPIKE_GROUPS:
+        raise ValueError(f"Unsupported spike group: {group_col}")
+    if not DB_PATH.exists():
+        return pd.DataFrame(columns=out_cols)
+
+    now = datetime.now() if now is None else now
+    cutoff_recent = now - timedelta(hours=24)
+    cutoff_lookback = now - timedelta(days=lookback_days)
+    cutoff_baseline_start = now - timedelta(days=baseline_days + 1)
+
+    where_sql, params = _event_filters(domain, min(cutoff_lookback, cutoff_baseline_start), min_priority)
     q = f"""
-    SELECT * FROM events
-    WHERE {where_sql}
-    ORDER BY ts DESC, priority DESC
+    WITH ev AS (
+      SELECT
+        ts,
+        domain,
+        list_filter(list_transform(string_split(coalesce(tags, ''), ','), t -> trim(t)), t -> t <> '') AS tag_list
+      FROM events
+      WHERE {where_sql}
+    ),
+    x AS (
+      SELECT
+        ts,
+        CAST(ts AS DATE) AS date,
+        domain,
+        UNNEST(CASE WHEN len(tag_list) = 0 THEN ['untagged:' || domain] ELSE tag_list END) AS situation
+      FROM ev
+    ),
+    per_day AS (
+      SELECT
+        {group_col} AS grp,
+        date,
+        count(*) FILTER (WHERE ts >= ?) AS lookback,
+        count(*) FILTER (WHERE ts >= ?) AS recent,
+        count(*) FILTER (WHERE ts >= ? AND ts < ?) AS baseline
+      FROM x
+      WHERE {group_col} IS NOT NULL
+      GROUP BY grp, date
+    ),
+    stats AS (
+      SELECT
+        grp,
+        avg(lookback) FILTER (WHERE lookback > 0) AS mu,
+        stddev_samp(lookback) FILTER (WHERE lookback > 0) AS sigma,
+        sum(lookback) AS total,
+        sum(recent) AS recent_24h,
+        coalesce(avg(baseline) FILTER (WHERE baseline > 0), 0.0) AS baseline_avg,
+        coalesce(
+          sum(lookback) FILTER (WHERE date = (SELECT max(date) FROM per_day WHERE lookback > 0)), 0
+        ) AS today_count
+      FROM per_day
+      GROUP BY grp
+      HAVING count(*) FILTER (WHERE lookback > 0) > 0
+    ),
+    scored AS (
+      SELECT
+        *,
+        coalesce((today_count - mu) / nullif(sigma, 0), 0.0) AS z_today,
+        CASE
+          WHEN baseline_avg > 0 THEN (recent_24h - baseline_avg) / baseline_avg * 100.0
+          WHEN recent_24h > 0 THEN 999.0
+          ELSE 0.0
+        END AS pct_vs_baseline
+      FROM stats
+      WHERE total >= ?
+    )
+    -- round_even: half-to-even like pandas .round(), so values match detect_spikes
+    SELECT
+      grp AS "group",
+      CAST(recent_24h AS INTEGER) AS recent_24h,
+      round_even(baseline_avg, 2) AS baseline_avg,
+      round_even(pct_vs_baseline, 1) AS pct_vs_baseline,
+      round_even(z_today, 2) AS z_today,
+      CAST(total AS INTEGER) AS total
+    FROM scored
+    ORDER BY scored.z_today * 10.0 + scored.recent_24h * 3.0 + scored.pct_vs_baseline * 0.05 DESC
+    LIMIT ?
     """
-    df = con.execute(q, params).df()
-    con.close()
+    params += [cutoff_lookback, cutoff_recent, cutoff_baseline_start, cutoff_recent, min_total, top_n]
+
+    with _reader() as con:
+        df = con.execute(q, params).df()
     return df
@@ -2,51 +2,114 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+import csv
 import re
+import numpy as np
 import pandas as pd
 from rapidfuzz import process, fuzz
 
-_GEO_PATH = Path("data/geo_index.csv")
+_GEO_PATH = Path("data/geo_index.parquet")
+_GEO_CSV_PATH = Path("data/geo_index.csv")  # legacy index, no alias_norm column
+_CITIES_PATH = Path("data/cities15000.txt")
+_COUNTRIES_PATH = Path("data/countryInfo.txt")
+_GEO_COLUMNS = ["alias", "alias_norm", "lat", "lon", "country_code"]
 _GEO_DF: Optional[pd.DataFrame] = None
-_GEO_SET = None
-_GEO_CHOICES: Optional[List[str]] = None
+_GEO_INDEX: Optional[Dict[str, int]] = None  # alias_norm -> first (most populous) row
+_GEO_COLS: Optional[Dict[str, np.ndarray]] = None
+_GEO_CHOICES: Optional[Tuple[str, ...]] = None
+
+
+# simple punctuation that often appears in headlines -> space
+_PUNCT = ",.;:()[]{}!?\"'`"
+_PUNCT_TABLE = str.maketrans({c: " " for c in _PUNCT})
+_PUNCT_RE = re.compile(f"[{re.escape(_PUNCT)}]")
+_WS_RE = re.compile(r"\s+")
 
 
 def _norm(s: str) -> str:
     s = "" if s is None else str(s)
-    s = s.strip().lower()
-    # remove simple punctuation that often appears in headlines
-    s = re.sub(r"[\,\.\;\:\(\)\[\]\{\}\!\?\"\'`]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    s = s.strip().lower().translate(_PUNCT_TABLE)
+    return _WS_RE.sub(" ", s).strip()
+
 
+def _norm_series(s: pd.Series) -> pd.Series:
+    # _norm over a whole column with pandas string kernels; object dtype keeps Python's
+    # str.lower/re semantics (Arrow lowercases e.g. "İ" differently), so keys match _norm
+    s = s.fillna("").astype(str).astype(object)
+    return s.str.lower().str.replace(_PUNCT_RE, " ", regex=True).str.replace(_WS_RE, " ", regex=True).str.strip()
 
+
+def _country_rows() -> pd.DataFrame:
+    # The GeoNames city index has no country rows, so "Germany" could only fuzzy-match.
+    # Index each country name (countryInfo.txt) at its capital: the PPLC city of that
+    # country, else the city named like countryInfo's capital column (Israel has no PPLC).
+    if not (_COUNTRIES_PATH.exists() and _CITIES_PATH.exists()):
+        return pd.DataFrame(columns=_GEO_COLUMNS)
+    countries = pd.read_csv(
+        _COUNTRIES_PATH,
+        sep="\t",
+        comment="#",
+        header=None,
+        usecols=[0, 4, 5],
+        names=["country_code", "alias", "capital"],
+        dtype=str,
+        keep_default_na=False,  # "NA" is Namibia
+        quoting=csv.QUOTE_NONE,
+    )
+    cities = pd.read_csv(
+        _CITIES_PATH,
+        sep="\t",
+        header=None,
+        usecols=[1, 2, 4, 5, 7, 8, 14],
+        names=["name", "asciiname", "lat", "lon", "feature_code", "country_code", "population"],
+        dtype={"name": str, "asciiname": str, "feature_code": str, "country_code": str},
+        keep_default_na=False,
+        quoting=csv.QUOTE_NONE,
+    )
+    c = cities.merge(countries, on="country_code")
+    cap = c["capital"].str.strip()
+    is_pplc = c["feature_code"] == "PPLC"
+    named = (cap != "") & ((c["name"] == cap) | (c["asciiname"] == cap))
+    c = c[is_pplc | named].assign(is_pplc=is_pplc)
+    c = c.sort_values(["is_pplc", "population"], ascending=False).drop_duplicates("country_code")
+    c = c.assign(alias=c["alias"].str.strip())
+    return c.assign(alias_norm=_norm_series(c["alias"]))[_GEO_COLUMNS]
+
+
 def _load_geo() -> pd.DataFrame:
-    global _GEO_DF, _GEO_SET, _GEO_CHOICES
+    global _GEO_DF, _GEO_INDEX, _GEO_COLS, _GEO_CHOICES
     if _GEO_DF is not None:
         return _GEO_DF
-    if not _GEO_PATH.exists():
+    if _GEO_PATH.exists():
+        df = pd.read_parquet(_GEO_PATH, engine="pyarrow", columns=_GEO_COLUMNS)
+    elif _GEO_CSV_PATH.exists():
+        df = pd.read_csv(_GEO_CSV_PATH, dtype={"alias": str, "country_code": str})
+        df["alias_norm"] = _norm_series(df["alias"])
+    else:
         raise FileNotFoundError(f"Missing geo index: {_GEO_PATH}. Run your geo index builder first.")
-    df = pd.read_csv(_GEO_PATH, dtype={"alias": str, "country_code": str})
 
-    df["alias_norm"] = df["alias"].fillna("").astype(str).apply(_norm)
     df = df[df["alias_norm"] != ""].copy()
-    df = df.reset_index(drop=True)
+    # country rows first: an exact country name beats a city alias of the same spelling
+    df = pd.concat([_country_rows(), df], ignore_index=True)
 
-    _GEO_SET = set(df["alias_norm"].unique())
-    _GEO_CHOICES = df["alias_norm"].tolist()
+    # rows are sorted by population, so the first row per alias is the preferred hit
+    first = ~df["alias_norm"].duplicated()
+    _GEO_INDEX = dict(zip(df.loc[first, "alias_norm"], df.index[first]))
+    _GEO_COLS = {c: df[c].to_numpy() for c in ("alias", "lat", "lon", "country_code")}
+    _GEO_CHOICES = tuple(df["alias_norm"].tolist())
     _GEO_DF = df
     return df
 
 
-def _row_to_hit(query: str, row: pd.Series) -> Dict[str, Any]:
+def _row_to_hit(query: str, idx: int) -> Dict[str, Any]:
+    cols = _GEO_COLS
     return {
         "query": query,
-        "label": str(row.get("alias") or query),
-        "lat": float(row["lat"]),
-        "lon": float(row["lon"]),
-        "country": str(row.get("country_code") or ""),
+        "label": str(cols["alias"][idx] or query),
+        "lat": float(cols["lat"][idx]),
+        "lon": float(cols["lon"][idx]),
+        "country": str(cols["country_code"][idx] or ""),
         "place_type": "geonames",
     }
 
@@ -55,28 +118,28 @@ def lookup_place_exact(name: str) -> Optional[Dict[str, Any]]:
     if not name:
         return None
 
-    df = _load_geo()
+    _load_geo()
     key = _norm(name)
-    if not key or key not in _GEO_SET:
-        return None
-
-    hit = df[df["alias_norm"] == key].head(1)
-    if hit.empty:
+    idx = _GEO_INDEX.get(key) if key else None
+    if idx is None:
         return None
 
-    return _row_to_hit(name, hit.iloc[0])
+    return _row_to_hit(name, idx)
 
 
 def lookup_candidates(cands: List[str]) -> Optional[Dict[str, Any]]:
     if not cands:
         return None
 
-    df = _load_geo()
+    _load_geo()
     for c in cands:
         hit = lookup_place_exact(c)
         if hit:
             return hit
 
+    # no exact alias: fuzzy-score candidates in order, one query per pass over the
+    # choices, and stop at the first hit (usually the first candidate)
+    for c in cands:
         key = _norm(c)
         if not key:
             continue
@@ -88,5 +151,5 @@ def lookup_candidates(cands: List[str]) -> Optional[Dict[str, Any]]:
         )
         if match:
             _, _, idx = match
-            return _row_to_hit(c, df.iloc[idx])
+            return _row_to_hit(c, int(idx))
     return None
@@ -0,0 +1,133 @@
+# monitor/geotrie.py
+from __future__ import annotations
+
+import csv
+import hashlib
+import pickle
+from importlib import metadata
+from pathlib import Path
+from typing import FrozenSet, List, Optional, Tuple
+
+import ahocorasick
+import pandas as pd
+
+from monitor.geo_lookup import _CITIES_PATH, _COUNTRIES_PATH, _GEO_CSV_PATH, _GEO_PATH, _load_geo
+
+_CACHE_PATH = Path("data/geo_trie.pkl")  # built on first use, rebuilt when its key changes
+_AC: Optional[ahocorasick.Automaton] = None
+_LEADS: FrozenSet[str] = frozenset()  # first words of multi-word place names
+# aliases like "The Hague" or "As Sulaymaniyah" start with words that also open
+# ordinary sentences ("In Kyiv, ..."); those never mark a name's tail
+_NOT_LEADS = {"A", "An", "The", "In", "At", "On", "To", "For", "Of", "And", "As", "By", "From"}
+
+
+def _place_names() -> List[str]:
+    # GeoNames city names (name + asciiname, pop > 15k), country names, and the
+    # multi-word alternate names of the geo index ("New York", so the match isn't
+    # just "York"). Single-word alternates are left out: across all languages they
+    # cover ordinary title-case words ("Big", "From") that would outrank the real place.
+    # Only capitalized names: matching stays case-sensitive like the old
+    # capitalized-sequence sweep, so "nice" or "mobile" in lowercase text never hit.
+    cities = pd.read_csv(
+        _CITIES_PATH,
+        sep="\t",
+        header=None,
+        usecols=[1, 2],
+        names=["name", "asciiname"],
+        dtype=str,
+        keep_default_na=False,
+        quoting=csv.QUOTE_NONE,
+    )
+    names = set(cities["name"]) | set(cities["asciiname"])
+    names.update(a for a in _load_geo()["alias"].dropna().astype(str) if " " in a)
+    with open(_COUNTRIES_PATH, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) > 4:
+                names.add(fields[4].strip())
+    return sorted(n for n in names if len(n) >= 3 and n[0].isupper())
+
+
+def _build() -> Tuple[ahocorasick.Automaton, FrozenSet[str]]:
+    ac = ahocorasick.Automaton()
+    leads = set()
+    for name in _place_names():
+        ac.add_word(name, name)
+        if " " in name and name.split(" ", 1)[0] not in _NOT_LEADS:
+            leads.add(name.split(" ", 1)[0])
+    ac.make_automaton()
+    return ac, frozenset(leads)
+
+
+def _cache_key() -> tuple:
+    # A pickle is only reused for the same sources, the same build code and the
+    # same pyahocorasick (its pickle format is not stable across versions).
+    geo_path = _GEO_PATH if _GEO_PATH.exists() else _GEO_CSV_PATH
+    try:
+        ac_version = metadata.version("pyahocorasick")
+    except metadata.PackageNotFoundError:
+        ac_version = ""
+    return (
+        tuple((str(p), p.stat().st_mtime_ns) for p in (geo_path, _CITIES_PATH, _COUNTRIES_PATH)),
+        hashlib.sha256(Path(__file__).read_bytes()).hexdigest(),
+        ac_version,
+    )
+
+
+def _load() -> ahocorasick.Automaton:
+    global _AC, _LEADS
+    if _AC is not None:
+        return _AC
+
+    key = _cache_key()
+    try:
+        with open(_CACHE_PATH, "rb") as f:
+            cached_key, ac, leads = pickle.load(f)
+        if cached_key == key:
+            _AC, _LEADS = ac, leads
+            return _AC
+    except Exception:
+        pass  # missing, old-format or unreadable cache: rebuild below
+
+    _AC, _LEADS = _build()
+    try:
+        with open(_CACHE_PATH, "wb") as f:
+            pickle.dump((key, _AC, _LEADS), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # read-only checkout: keep the in-memory automaton
+    return _AC
+
+
+def _is_tail(text: str, start: int) -> bool:
+    # "Bank" in "West Bank": the word before the match starts a multi-word place
+    # name, so the match is the tail of a longer name the gazetteer doesn't know.
+    # A plain capitalized word ("Hackers Target Taiwan") doesn't count.
+    if start < 2 or text[start - 1] != " ":
+        return False
+    k = start - 1
+    while k > 0 and text[k - 1].isalpha():
+        k -= 1
+    return text[k:start - 1] in _LEADS
+
+
+def find_places(text: str) -> List[str]:
+    """
+    Gazetteer place names in text, in order of appearance.
+    - Longest match wins ("Los Angeles", not "Angeles")
+    - Matches must sit on word boundaries
+    - Tails of longer capitalized names are dropped ("Bank" in "West Bank")
+    """
+    out: List[str] = []
+    n = len(text)
+    for end, name in _load().iter_long(text):
+        start = end - len(name) + 1
+        if start > 0 and text[start - 1].isalnum():
+            continue
+        if end + 1 < n and text[end + 1].isalnum():
+            continue
+        if _is_tail(text, start):
+            continue
+        out.append(name)
+    return out
@@ -3,13 +3,20 @@ from __future__ import annotations
 
 import hashlib
 import re
-from typing import Optional, Dict, Any, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields
+from functools import lru_cache, partial
+from typing import Optional, Dict, Any, List, Tuple, Set
 
+import ahocorasick
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 
-from monitor.db import upsert_events
-from monitor.rss_ingest import fetch_rss
+from monitor.db import close, upsert_events
+from monitor.rss_ingest import RssRow, fetch_rss, load_feed_cache, save_feed_cache
 from monitor.geo_lookup import lookup_candidates
+from monitor.geotrie import find_places
 
 SOURCES = [
     {"domain": "geopolitics", "source_name": "BBC World", "url": "https://feeds.bbci.co.uk/news/world/rss.xml"},
@@ -18,19 +25,29 @@ SOURCES = [
     {"domain": "cti", "source_name": "KrebsOnSecurity", "url": "https://krebsonsecurity.com/feed/"},
 ]
 
+# feeds are fetched concurrently: each fetch is network-bound
+FETCH_WORKERS = 8
+
+# SOURCES is fixed at import: bind one fetcher per feed up front
+_FETCHERS = tuple(partial(fetch_rss, src) for src in SOURCES)
+
 def _safe_str(x) -> str:
     return "" if x is None else str(x)
 
 def _hash_id(*parts: str) -> str:
+    # stored event_ids are SHA-256 prefixes: changing the hash would re-insert every
+    # entry still in the feeds under a new id
     h = hashlib.sha256()
     for p in parts:
         h.update(_safe_str(p).encode("utf-8", errors="ignore"))
         h.update(b"|")
     return h.hexdigest()[:24]
 
+_WS_RE = re.compile(r"\s+")
+
 def _norm(s: str) -> str:
     s = (_safe_str(s)).strip()
-    s = re.sub(r"\s+", " ", s)
+    s = _WS_RE.sub(" ", s)
     return s
 
 # geo candidates
@@ -38,83 +55,139 @@ STOP_PLACES = {
     "monday","tuesday","wednesday","thursday","friday","saturday","sunday",
     "today","yesterday","breaking","analysis","update","exclusive","report",
     "video","live","fighting","talks","stall","says","say",
+    # title-case function words and common nouns that are also GeoNames places
+    # ("Police Raid Hamburg Offices" -> Police, PL; "Deadly Floods Hit Pakistan" -> Hit, IQ)
+    "the","from","with","after","over","into","amid","against","about","under",
+    "police","hit","hits","big","bank","bay","best","deal","man","march","most",
+    "normal","reading","retreat","sale","split","union","mobile","orange",
+    "liberty","independence","enterprise","paradise","eagle",
 }
 
 REGION_HINTS = [
     "middle east", "europe", "asia", "africa", "south america", "north america"
 ]
 
-PLACE_PATTERNS = [
-    r"\bin\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,3})\b",
-    r"\bnear\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,3})\b",
-    r"\bat\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,3})\b",
-    r"\bfrom\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,3})\b",
-]
+# "in/near/at/from <Capitalized Words>", all prepositions in one alternation: a single
+# sweep over the text, compiled once (extract_place_candidates runs for every entry)
+_PREP_RE = re.compile(r"\b(in|near|at|from)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,3})\b")
+# candidates keep the old per-pattern priority: all "in" hits first, then "near", ...
+_PREP_RANK = {"in": 0, "near": 1, "at": 2, "from": 3}
+
+# below this many region/preposition candidates, also sweep the gazetteer trie
+MIN_CANDS = 3
 
-def extract_place_candidates(title: str, summary: str) -> List[str]:
-    text = f"{_safe_str(title)} {_safe_str(summary)}"
-    text = re.sub(r"\s+", " ", text).strip()
+def _event_text(title: str, summary: str) -> str:
+    # "title summary" with whitespace collapsed; built once per entry in ingest_all
+    return _WS_RE.sub(" ", f"{_safe_str(title)} {_safe_str(summary)}").strip()
+
+def extract_place_candidates(
+    title: str, summary: str, text: Optional[str] = None, text_lower: Optional[str] = None
+) -> List[str]:
+    if text is None:
+        text = _event_text(title, summary)
+    low = text.lower() if text_lower is None else text_lower
 
     cands: List[str] = []
 
-    low = text.lower()
     for r in REGION_HINTS:
         if r in low:
             cands.append(r.title())
 
-    for pat in PLACE_PATTERNS:
-        for m in re.finditer(pat, text):
-            p = _norm(m.group(1))
-            if p and p.lower() not in STOP_PLACES:
-                cands.append(p)
-
-    # Capitalized sequences (conservative)
-    seqs = re.findall(r"\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2})\b", text)
-    for s in seqs:
-        s = _norm(s)
-        if len(s) >= 3 and s.lower() not in STOP_PLACES:
-            cands.append(s)
-
-    out: List[str] = []
-    seen = set()
-    for c in cands:
-        k = c.lower()
-        if k not in seen:
-            seen.add(k)
-            out.append(c)
-    return out[:10]
-
-def choose_best_geo(title: str, summary: str) -> Optional[Dict[str, Any]]:
-    cands = extract_place_candidates(title, summary)
-    return lookup_candidates(cands)
+    for m in sorted(_PREP_RE.finditer(text), key=lambda m: _PREP_RANK[m.group(1)]):
+        p = _norm(m.group(2))
+        if p and p.lower() not in STOP_PLACES:
+            cands.append(p)
+
+    # Gazetteer names (GeoNames trie): only real places, instead of every capitalized run.
+    # Fallback only: well-formed headlines already gave enough region/preposition hits.
+    if len(cands) < MIN_CANDS:
+        for s in find_places(text):
+            if s.lower() not in STOP_PLACES:
+                cands.append(s)
+
+    # case-insensitive dedup, first spelling wins (reversed pairs: earliest written last)
+    keys = [c.lower() for c in cands]
+    first = dict(zip(reversed(keys), reversed(cands)))
+    return [first[k] for k in dict.fromkeys(keys)][:10]
+
+@lru_cache(maxsize=4096)
+def _lookup_cached(cands: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+    # feeds repeat the same places across entries and refreshes
+    return lookup_candidates(list(cands))
+
+def choose_best_geo(
+    title: str, summary: str, text: Optional[str] = None, text_lower: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    cands = extract_place_candidates(title, summary, text=text, text_lower=text_lower)
+    hit = _lookup_cached(tuple(cands))
+    return dict(hit) if hit else None  # callers get their own copy of the cached hit
 
 # scoring + tags
 CTI_KEYWORDS = ["phishing", "ransomware", "malware", "cve", "breach", "ddos", "apt", "exploit"]
 GEO_KEYWORDS = ["war", "missile", "strike", "protest", "ceasefire", "border", "sanctions", "military"]
 
-def score_event(domain: str, title: str, summary: str) -> Tuple[int, int, int]:
-    text = f"{title} {summary}".lower()
+# one automaton over both keyword lists: a single pass over the text finds every
+# keyword that occurs as a substring (same semantics as `k in text`)
+_KW_AC = ahocorasick.Automaton()
+for _group, _kws in (("cti", CTI_KEYWORDS), ("geo", GEO_KEYWORDS)):
+    for _k in _kws:
+        _KW_AC.add_word(_k, (_group, _k))
+_KW_AC.make_automaton()
+
+def _scan(text: str) -> Tuple[Set[str], Set[str]]:
+    """Return (cti_hits, geo_hits) for an already lowercased text."""
+    cti: Set[str] = set()
+    geo: Set[str] = set()
+    for _, (group, k) in _KW_AC.iter(text):
+        (cti if group == "cti" else geo).add(k)
+    return cti, geo
+
+def score_event(
+    domain: str, text_lower: str, kw_hits: Optional[Tuple[Set[str], Set[str]]] = None
+) -> Tuple[int, int, int]:
+    cti_hits, geo_hits = kw_hits if kw_hits is not None else _scan(text_lower)
     base = 20
     if domain == "cti":
-        hits = sum(1 for k in CTI_KEYWORDS if k in text)
+        hits = len(cti_hits)
         severity = min(100, base + hits * 15)
         confidence = min(100, 60 + hits * 8)
     else:
-        hits = sum(1 for k in GEO_KEYWORDS if k in text)
+        hits = len(geo_hits)
         severity = min(100, base + hits * 15)
         confidence = min(100, 55 + hits * 8)
     priority = int(min(100, severity * 0.7 + confidence * 0.3))
     return int(severity), int(confidence), int(priority)
 
-def build_tags(domain: str, title: str, summary: str, geo_hit: Optional[Dict[str, Any]]) -> str:
+def score_events(
+    domain: pd.Series, kw_hits: List[Tuple[Set[str], Set[str]]]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Column-wise score_event: (severity, confidence, priority) int16 arrays aligned with domain."""
+    is_cti = (domain == "cti").to_numpy()
+    n = len(kw_hits)
+    hits_cti = np.fromiter((len(cti) for cti, _ in kw_hits), dtype=np.int16, count=n)
+    hits_geo = np.fromiter((len(geo) for _, geo in kw_hits), dtype=np.int16, count=n)
+    severity = np.where(is_cti, np.minimum(100, 20 + hits_cti * 15), np.minimum(100, 20 + hits_geo * 15))
+    confidence = np.where(is_cti, np.minimum(100, 60 + hits_cti * 8), np.minimum(100, 55 + hits_geo * 8))
+    severity = severity.astype(np.int16)
+    confidence = confidence.astype(np.int16)
+    # truncate then clamp == int(min(100, x)) for the non-negative scores here
+    priority = np.minimum(100, (severity * 0.7 + confidence * 0.3).astype(np.int16))
+    return severity, confidence, priority
+
+def build_tags(
+    domain: str,
+    text_lower: str,
+    geo_hit: Optional[Dict[str, Any]],
+    kw_hits: Optional[Tuple[Set[str], Set[str]]] = None,
+) -> str:
     tags: List[str] = []
     if domain:
         tags.append(domain)
 
-    text = f"{title} {summary}".lower()
-    for k in (CTI_KEYWORDS + GEO_KEYWORDS):
-        if k in text:
-            tags.append(k)
+    cti_hits, geo_hits = kw_hits if kw_hits is not None else _scan(text_lower)
+    # keyword list order, as before
+    tags.extend(k for k in CTI_KEYWORDS if k in cti_hits)
+    tags.extend(k for k in GEO_KEYWORDS if k in geo_hits)
 
     if geo_hit:
         label = (geo_hit.get("label") or geo_hit.get("query") or "").strip().lower()
@@ -125,88 +198,112 @@ def build_tags(domain: str, title: str, summary: str, geo_hit: Optional[Dict[str
         if country:
             tags.append(f"country:{country}")
 
-    out = []
-    seen = set()
-    for t in tags:
-        t = t.strip()
-        if t and t not in seen:
-            seen.add(t)
-            out.append(t)
-    return ",".join(out)
+    return ",".join(dict.fromkeys(t for t in (t.strip() for t in tags) if t))
 
-def ingest_all(limit_per_feed: int = 35) -> pd.DataFrame:
-    rows: List[Dict[str, Any]] = []
-    for src in SOURCES:
-        rows.extend(fetch_rss(src, limit=limit_per_feed))
+def ingest_all(limit_per_feed: int = 35) -> pa.Table:
+    rows: List[RssRow] = []
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(_FETCHERS))) as ex:
+        # map keeps SOURCES order, so rows come out the same as a serial fetch
+        for feed_rows in ex.map(lambda fetch: fetch(limit=limit_per_feed), _FETCHERS):
+            rows.extend(feed_rows)
 
     if not rows:
-        return pd.DataFrame()
-
-    out_rows = []
+        return pa.table({})
+
+    df = pd.DataFrame({f.name: [getattr(r, f.name) for r in rows] for f in fields(RssRow)})
+
+    # ensure datetime: one vectorized parse, unparseable rows dropped, tz stripped
+    df["ts"] = pd.to_datetime(df["ts"], errors="coerce")
+    if isinstance(df["ts"].dtype, pd.DatetimeTZDtype):
+        df["ts"] = df["ts"].dt.tz_localize(None)
+    df = df.dropna(subset=["ts"]).reset_index(drop=True)
+
+    # per-row text work (place regexes, geo index, keyword automaton) writes into
+    # preallocated columns; numeric ones are typed arrays instead of inferred from dicts
+    n = len(df)
+    event_ids: List[str] = [""] * n
+    tags: List[str] = [""] * n
+    kw_hits: List[Tuple[Set[str], Set[str]]] = []
+    geo_query: List[Optional[str]] = [None] * n
+    geo_label: List[Optional[str]] = [None] * n
+    geo_country: List[Optional[str]] = [None] * n
+    geo_type: List[Optional[str]] = [None] * n
+    geo_lat = np.full(n, np.nan)
+    geo_lon = np.full(n, np.nan)
     geo_ok = 0
-    geo_miss = 0
-
-    for r in rows:
-        domain = r.get("domain", "all")
-        source_name = r.get("source_name", "")
-        link = r.get("source_url", "")
-        title = r.get("title", "")
-        summary = r.get("summary", "")
-        ts = r.get("ts")
-
-        # ensure datetime
-        ts = pd.to_datetime(ts, errors="coerce")
-        if pd.isna(ts):
-            continue
-        ts = ts.to_pydatetime().replace(tzinfo=None)
-
-        geo_hit = choose_best_geo(title, summary)
+
+    cols = zip(
+        df["domain"], df["source_name"], df["source_url"], df["title"], df["summary"], df["ts"].dt.to_pydatetime()
+    )
+    for i, (domain, source_name, link, title, summary, ts) in enumerate(cols):
+        # one combined buffer (and one lowercase copy) shared by geo, scoring and tags
+        text = _event_text(title, summary)
+        text_lower = text.lower()
+
+        geo_hit = choose_best_geo(title, summary, text=text, text_lower=text_lower)
         if geo_hit:
             geo_ok += 1
-        else:
-            geo_miss += 1
-
-        severity, confidence, priority = score_event(domain, title, summary)
-        tags = build_tags(domain, title, summary, geo_hit)
-
-        event_id = _hash_id(domain, source_name, link, title, str(ts))
-
-        out_rows.append(
-            {
-                "event_id": event_id,
-                "ts": ts,
-                "domain": domain,
-                "title": title,
-                "summary": summary,
-                "source_name": source_name,
-                "source_url": link,
-                "topic": "",
-                "actors": "",
-                "geo": "",
-                "severity": severity,
-                "confidence": confidence,
-                "priority": priority,
-                "tags": tags,
-                "geo_query": geo_hit.get("query") if geo_hit else None,
-                "geo_label": geo_hit.get("label") if geo_hit else None,
-                "geo_country": geo_hit.get("country") if geo_hit else None,
-                "geo_type": geo_hit.get("place_type") if geo_hit else None,
-                "geo_lat": geo_hit.get("lat") if geo_hit else None,
-                "geo_lon": geo_hit.get("lon") if geo_hit else None,
-            }
-        )
-
-    df = pd.DataFrame(out_rows)
-    print(f"[INGEST] fetched={len(df)} geo_ok={geo_ok} geo_miss={geo_miss}")
-    return df
+            geo_query[i] = geo_hit.get("query")
+            geo_label[i] = geo_hit.get("label")
+            geo_country[i] = geo_hit.get("country")
+            geo_type[i] = geo_hit.get("place_type")
+            if geo_hit.get("lat") is not None:
+                geo_lat[i] = geo_hit["lat"]
+            if geo_hit.get("lon") is not None:
+                geo_lon[i] = geo_hit["lon"]
+
+        hits = _scan(text_lower)
+        kw_hits.append(hits)
+        tags[i] = build_tags(domain, text_lower, geo_hit, kw_hits=hits)
+        event_ids[i] = _hash_id(domain, source_name, link, title, str(ts))
+
+    geo_miss = n - geo_ok
+    severity, confidence, priority = score_events(df["domain"], kw_hits)
+
+    # Arrow table straight from the columns: DuckDB scans it without a pandas
+    # round trip (NaN lat/lon -> NULL, repeated domain/source strings dictionary-encoded)
+    empty = pa.array([""] * n, pa.string())
+    tbl = pa.table(
+        {
+            "event_id": pa.array(event_ids, pa.string()),
+            "ts": pa.array(df["ts"], pa.timestamp("us")),
+            "domain": pa.array(df["domain"], pa.string()).dictionary_encode(),
+            "title": pa.array(df["title"], pa.string()),
+            "summary": pa.array(df["summary"], pa.string()),
+            "source_name": pa.array(df["source_name"], pa.string()).dictionary_encode(),
+            "source_url": pa.array(df["source_url"], pa.string()),
+            "topic": empty,
+            "actors": empty,
+            "geo": empty,
+            "severity": pa.array(severity),
+            "confidence": pa.array(confidence),
+            "priority": pa.array(priority),
+            "tags": pa.array(tags, pa.string()),
+            "geo_query": pa.array(geo_query, pa.string()),
+            "geo_label": pa.array(geo_label, pa.string()),
+            "geo_country": pa.array(geo_country, pa.string()),
+            "geo_type": pa.array(geo_type, pa.string()),
+            "geo_lat": pa.array(geo_lat, from_pandas=True),
+            "geo_lon": pa.array(geo_lon, from_pandas=True),
+        }
+    )
+    print(f"[INGEST] fetched={tbl.num_rows} geo_ok={geo_ok} geo_miss={geo_miss}")
+    return tbl
 
 def main():
-    df = ingest_all(limit_per_feed=35)
-    if df.empty:
+    load_feed_cache()
+    tbl = ingest_all(limit_per_feed=35)
+    if tbl.num_rows == 0:
         print("[INGEST] No rows fetched.")
         return
-    upsert_events(df)
-    print(f"[INGEST] Upserted events: {len(df)}")
+    # the write connection (and its file lock) only lives for the store:
+    # dashboards can keep reading while feeds are fetched and geocoded
+    try:
+        upsert_events(tbl)
+        save_feed_cache()
+    finally:
+        close()
+    print(f"[INGEST] Upserted events: {tbl.num_rows}")
 
 if __name__ == "__main__":
     main()
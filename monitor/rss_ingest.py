@@ -2,8 +2,50 @@
 from __future__ import annotations
 
 import feedparser
+import threading
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Dict, List, Any
+from typing import Dict, List, Optional, Tuple
+
+from monitor.db import load_feed_validators, save_feed_validators
+
+
+@dataclass(slots=True)
+class RssRow:
+    # one normalized feed entry; slots keep it small and attribute access cheap
+    ts: datetime  # naive UTC (duckdb timestamp)
+    title: str
+    summary: str
+    source_url: str
+    source_name: str
+    domain: str
+
+
+# Conditional GET validators per feed URL: url -> (etag, modified).
+# Unchanged feeds answer 304 and skip the download + XML parse.
+# Stored in the events database (feeds table); nothing is sent until load_feed_cache runs.
+_FEED_CACHE: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+_FEED_CACHE_LOCK = threading.Lock()  # fetch_rss runs on a thread pool
+_FEED_CACHE_DIRTY: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+
+
+def load_feed_cache() -> None:
+    """Read the stored validators once, before fetching (no DB access inside fetch_rss)."""
+    validators = load_feed_validators()
+    with _FEED_CACHE_LOCK:
+        _FEED_CACHE.update(validators)
+
+
+def save_feed_cache() -> None:
+    """
+    Persist the validators seen by fetch_rss.
+    Call after the fetched rows are stored: saving first would make the next run
+    skip entries that never reached the DB.
+    """
+    with _FEED_CACHE_LOCK:
+        data = dict(_FEED_CACHE_DIRTY)
+        _FEED_CACHE_DIRTY.clear()
+    save_feed_validators(data)
 
 
 def _parse_ts(entry) -> datetime:
@@ -14,22 +56,32 @@ def _parse_ts(entry) -> datetime:
     return datetime.now(timezone.utc)
 
 
-def fetch_rss(source: Dict[str, str], limit: int = 35) -> List[Dict[str, Any]]:
+def fetch_rss(source: Dict[str, str], limit: int = 35) -> List[RssRow]:
     """
     Fetch RSS and normalize entries to a common schema.
     Expected source keys:
       - domain
       - source_name
       - url
-    Returns list of dict rows: ts, title, summary, source_url, source_name, domain
+    Returns list of RssRow: ts, title, summary, source_url, source_name, domain
     """
     url = source["url"]
     domain = source.get("domain", "all")
     source_name = source.get("source_name", "RSS")
 
-    feed = feedparser.parse(url)
+    with _FEED_CACHE_LOCK:
+        etag, modified = _FEED_CACHE.get(url, (None, None))
+
+    # feedparser already tries the libxml2 SAX driver (PREFERRED_XML_PARSERS) before expat
+    feed = feedparser.parse(url, etag=etag, modified=modified)
+    if feed.get("status") == 304:
+        return []  # not modified since the last stored fetch
+
+    if feed.get("etag") or feed.get("modified"):
+        with _FEED_CACHE_LOCK:
+            _FEED_CACHE[url] = _FEED_CACHE_DIRTY[url] = (feed.get("etag"), feed.get("modified"))
 
-    rows: List[Dict[str, Any]] = []
+    rows: List[RssRow] = []
     for e in feed.entries[:limit]:
         title = getattr(e, "title", "") or ""
         link = getattr(e, "link", "") or ""
@@ -37,14 +89,14 @@ def fetch_rss(source: Dict[str, str], limit: int = 35) -> List[Dict[str, Any]]:
         ts = _parse_ts(e)
 
         rows.append(
-            {
-                "ts": ts.replace(tzinfo=None),  # duckdb timestamp naive ok
-                "title": str(title),
-                "summary": str(summary),
-                "source_url": str(link),
-                "source_name": str(source_name),
-                "domain": str(domain),
-            }
+            RssRow(
+                ts=ts.replace(tzinfo=None),  # duckdb timestamp naive ok
+                title=str(title),
+                summary=str(summary),
+                source_url=str(link),
+                source_name=str(source_name),
+                domain=str(domain),
+            )
         )
 
     return rows
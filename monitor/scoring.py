@@ -1,12 +1,21 @@
 # monitor/scoring.py
 from datetime import datetime, timezone
-from typing import List, Tuple
+from functools import lru_cache
+from typing import List, Tuple, Set
 from dateutil import parser
+import ahocorasick
+import numpy as np
+import pandas as pd
 
 def _safe_dt(dt):
-    if isinstance(dt, str):
+    if not isinstance(dt, str):
+        return dt
+    # ISO-8601 (what pandas and fetch_rss hand us) takes the C fast path;
+    # anything else still goes through dateutil's full grammar
+    try:
+        return datetime.fromisoformat(dt.replace("Z", "+00:00"))
+    except ValueError:
         return parser.parse(dt)
-    return dt
 
 def recency_score(ts: datetime, max_points: int = 25) -> int:
     ts = _safe_dt(ts)
@@ -18,13 +27,48 @@ def recency_score(ts: datetime, max_points: int = 25) -> int:
     score = max_points * (1.0 / (1.0 + (hours / 24.0)))
     return int(round(min(max_points, max(0.0, score))))
 
+def recency_scores(ts, max_points: int = 25) -> np.ndarray:
+    # batch recency_score: one vectorized pass instead of a Python call per event
+    # (naive timestamps are taken as UTC, as above; np.rint rounds half-even like round)
+    # format="mixed" parses each element on its own, like _safe_dt; without it pandas
+    # locks onto the first element's format and rejects e.g. "...Z" next to "... +02:00"
+    ts = pd.to_datetime(pd.Series(ts), utc=True, format="mixed")
+    if ts.isna().any():
+        # NaT would turn into int64 min below; recency_score raises on None too
+        raise ValueError("recency_scores: missing timestamp")
+    now = pd.Timestamp.now(tz="UTC")
+    hours = np.maximum(0.0, (now - ts).dt.total_seconds().to_numpy() / 3600.0)
+    score = max_points * (1.0 / (1.0 + (hours / 24.0)))
+    return np.rint(np.clip(score, 0.0, max_points)).astype(np.int64)
+
+def _automaton(words: Tuple[str, ...]) -> ahocorasick.Automaton:
+    ac = ahocorasick.Automaton()
+    for w in words:
+        ac.add_word(w, w)
+    ac.make_automaton()
+    return ac
+
+def _found(ac: ahocorasick.Automaton, text: str) -> Set[str]:
+    # every word occurring as a substring, in one pass (same as `w in text` per word)
+    return {w for _, w in ac.iter(text)}
+
+@lru_cache(maxsize=32)
+def _watch_ac(words: Tuple[str, ...]) -> ahocorasick.Automaton:
+    return _automaton(words)
+
 def watchlist_hits(text: str, watchlist: List[str]) -> Tuple[int, List[str]]:
     t = (text or "").lower()
-    hits = [w for w in watchlist if w.lower() in t]
+    words = tuple(sorted({w.lower() for w in watchlist if w}))
+    found = _found(_watch_ac(words), t) if words else set()
+    hits = [w for w in watchlist if w.lower() in found or not w]
     return len(hits), hits
 
+# Heurística “severity” simple: palabras gatillo
+TRIGGERS = ["exploit", "0day", "zero-day", "ransomware", "breach", "apt", "sanction", "missile", "attack", "killed"]
+_TRIG_AC = _automaton(tuple(TRIGGERS))
+
 def compute_priority(domain: str, title: str, summary: str, ts, watchlist: List[str], weights: dict) -> dict:
-    text = f"{title}\n{summary}"
+    text = f"{title}\n{summary}".lower()
     hit_count, hits = watchlist_hits(text, watchlist)
 
     rscore = recency_score(ts, max_points=weights.get("recency_max", 25))
@@ -32,9 +76,7 @@ def compute_priority(domain: str, title: str, summary: str, ts, watchlist: List[
 
     base = weights.get("base_domain_cti", 10) if domain == "cti" else 0
 
-    # Heurística “severity” simple: palabras gatillo
-    trig = ["exploit", "0day", "zero-day", "ransomware", "breach", "apt", "sanction", "missile", "attack", "killed"]
-    sev = 10 + 10 * sum(1 for k in trig if k in text.lower())
+    sev = 10 + 10 * len(_found(_TRIG_AC, text))
     sev = max(0, min(100, sev))
 
     priority = max(0, min(100, base + rscore + wscore + int(sev * 0.4)))
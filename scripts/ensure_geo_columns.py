@@ -1,12 +1,21 @@
 ﻿import duckdb
 
 con = duckdb.connect("events.duckdb")
-con.execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS geo_query VARCHAR")
-con.execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS geo_label VARCHAR")
-con.execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS geo_country VARCHAR")
-con.execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS geo_type VARCHAR")
-con.execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS geo_lat DOUBLE")
-con.execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS geo_lon DOUBLE")
+GEO_COLUMNS = [
+    ("geo_query", "VARCHAR"),
+    ("geo_label", "VARCHAR"),
+    ("geo_country", "VARCHAR"),
+    ("geo_type", "VARCHAR"),
+    ("geo_lat", "DOUBLE"),
+    ("geo_lon", "DOUBLE"),
+]
+
+# one transaction, one script: a single catalog commit instead of one per column
+con.execute(
+    "BEGIN;\n"
+    + "".join(f"ALTER TABLE events ADD COLUMN IF NOT EXISTS {c} {t};\n" for c, t in GEO_COLUMNS)
+    + "COMMIT;"
+)
 con.close()
 
 print("OK: columns ensured")